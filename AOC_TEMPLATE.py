@@ -14,11 +14,13 @@ from __future__ import annotations
 import argparse
 import logging
 import os
-import re
 import sys
 from pathlib import Path
+from typing import Iterable
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 ##################################################################################################
 # Configuration helpers
@@ -26,13 +28,12 @@ import requests
 
 BASE_DIR = Path(__file__).parent.resolve()
 
-day_match = re.match(r"Day_(\d+)$", BASE_DIR.name)
-if not day_match:
+if not (BASE_DIR.name.startswith("Day_") and BASE_DIR.name[4:].isdigit()):
     raise SystemExit(
         "This template is meant to be copied into a Day_XX folder. Run the per-day copy (e.g. Day_01/Solution_01.py)."
     )
 
-DAY = int(day_match.group(1))
+DAY = int(BASE_DIR.name[4:])
 DEFAULT_YEAR = 2025
 YEAR = int(os.environ.get("AOC_YEAR", DEFAULT_YEAR))
 
@@ -64,7 +65,7 @@ def load_session() -> str:
         if isinstance(candidate, str) and candidate.strip():
             return candidate.strip()
         if isinstance(candidate, Path) and candidate.exists():
-            return candidate.read_text().strip()
+            return candidate.read_bytes().strip().decode()
 
     raise RuntimeError(
         "Missing session cookie. Set AOC_SESSION_ID or place SessionID.txt next to this file or at repo root."
@@ -73,7 +74,28 @@ def load_session() -> str:
 
 SESSION_ID = load_session()
 session = requests.Session()
-session.headers.update({"cookie": f"session={SESSION_ID}", "User-Agent": USER_AGENT})
+session.headers.update(
+    {
+        "cookie": f"session={SESSION_ID}",
+        "User-Agent": USER_AGENT,
+        "Connection": "keep-alive",
+        "Accept-Encoding": "gzip, deflate",
+    }
+)
+_adapter = HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    max_retries=Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=[502, 503, 504],
+        raise_on_status=False,
+    ),
+)
+session.mount("https://", _adapter)
+session.mount("http://", _adapter)
+
+CHUNK_SIZE = 64 * 1024
 
 INPUT_CANDIDATES = [
     BASE_DIR / f"input_{DAY:02d}.txt",
@@ -86,38 +108,66 @@ def detect_part() -> int:
     return 2 if (BASE_DIR / "instructions-two.md").exists() else 1
 
 
+_CACHED_INPUT_PATH: Path | None = None
+
+
 def read_cached_input() -> str | None:
-    for candidate in INPUT_CANDIDATES:
-        if candidate.exists():
+    global _CACHED_INPUT_PATH
+
+    candidates = INPUT_CANDIDATES
+    if _CACHED_INPUT_PATH is not None:
+        candidates = dict.fromkeys((_CACHED_INPUT_PATH, *INPUT_CANDIDATES))
+
+    for candidate in candidates:
+        try:
+            contents = candidate.read_text()
+        except FileNotFoundError:
+            continue
+        if candidate != _CACHED_INPUT_PATH:
             logger.info(f"Using cached input: {candidate}")
-            return candidate.read_text()
+            _CACHED_INPUT_PATH = candidate
+        return contents
     return None
 
 
-def cache_input(contents: str) -> None:
+def cache_input(chunks: Iterable[bytes]) -> Path:
+    """Write to a temp file and rename it, so a cancelled download is never reused."""
+
     primary = BASE_DIR / f"input_{DAY:02d}.txt"
-    primary.write_text(contents)
+    tmp = primary.with_suffix(primary.suffix + ".tmp")
+    try:
+        with tmp.open("wb") as fh:
+            for chunk in chunks:
+                fh.write(chunk)
+        os.replace(tmp, primary)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return primary
+
 
+def fetch_input(day: int, year: int) -> Path:
+    """Stream the puzzle input straight into the cache file and return its path."""
 
-def fetch_input(day: int, year: int) -> str:
     url = f"https://adventofcode.com/{year}/day/{day}/input"
     logger.info(f"Fetching input from {url}")
-    response = session.get(url)
-    if response.status_code != 200:
-        raise RuntimeError(
-            f"Failed to fetch input (HTTP {response.status_code}). Check session cookie and year/day."
-        )
-    return response.text
+    with session.get(url, stream=True) as response:
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"Failed to fetch input (HTTP {response.status_code}). Check session cookie and year/day."
+            )
+        return cache_input(response.iter_content(CHUNK_SIZE))
 
 
 def get_input(day: int = DAY, year: int = YEAR) -> str:
+    global _CACHED_INPUT_PATH
+
     cached = read_cached_input()
     if cached is not None:
         return cached
 
-    contents = fetch_input(day, year)
-    cache_input(contents)
-    return contents
+    _CACHED_INPUT_PATH = fetch_input(day, year)
+    return _CACHED_INPUT_PATH.read_text()
 
 
 def submit(
@@ -218,9 +268,9 @@ def main() -> None:
     year = args.year
 
     if args.example:
-        puzzle_input = load_example().strip("\n")
+        puzzle_input = load_example().rstrip("\n")
     else:
-        puzzle_input = get_input(DAY, year).strip("\n")
+        puzzle_input = get_input(DAY, year).rstrip("\n")
 
     if part == 1:
         answer = solve_part1(puzzle_input)
@@ -1,14 +1,30 @@
 import argparse
+import atexit
+import importlib.util
 import logging
 import os
+import queue
 import re
 import shutil
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
+from typing import BinaryIO, Iterator
 
 import html2text
 import requests
 from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:  # fall back to BeautifulSoup below
+    HTMLParser = None
 
 # Fetches daily AoC pages/inputs and scaffolds solution folders.
 
@@ -18,6 +34,11 @@ from bs4 import BeautifulSoup
 
 DEFAULT_YEAR = 2025
 DEFAULT_DELAY = 1.0
+UNLOCK_GRACE = 1.0
+DEFAULT_WORKERS = 4
+CHUNK_SIZE = 64 * 1024
+BS4_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+_BIN_NAME_RE = re.compile(r'^\s*name\s*=\s*"([^"]+)"', re.MULTILINE)
 TEMPLATE_FILE = Path("AOC_TEMPLATE.py")
 RUST_TEMPLATE_FILE = Path("AOC_TEMPLATE.rs")
 DEFAULT_USER_AGENT = os.environ.get(
@@ -164,13 +185,20 @@ fn main() -> Result<()> {
 # Logging
 ##################################################################################################
 
-logging.basicConfig(
-    filename="aoc_fetch.log",
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s: %(message)s",
-)
+# Worker threads only enqueue records; a single listener thread does the I/O.
+_log_queue: queue.SimpleQueue = queue.SimpleQueue()
+_file_handler = logging.FileHandler("aoc_fetch.log")
+_file_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s: %(message)s"))
+_stream_handler = logging.StreamHandler()
+_stream_handler.addFilter(logging.Filter(__name__))
+
+logging.root.setLevel(logging.INFO)
+logging.root.addHandler(QueueHandler(_log_queue))
 logger = logging.getLogger(__name__)
-logger.addHandler(logging.StreamHandler())
+
+_log_listener = QueueListener(_log_queue, _file_handler, _stream_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
 
 ##################################################################################################
@@ -188,7 +216,7 @@ def load_session(explicit: str | None = None) -> str:
         if isinstance(candidate, str) and candidate.strip():
             return candidate.strip()
         if isinstance(candidate, Path) and candidate.exists():
-            return candidate.read_text().strip()
+            return candidate.read_bytes().strip().decode()
     raise SystemExit(
         "Missing session cookie. Set AOC_SESSION_ID or create SessionID.txt"
     )
@@ -197,28 +225,153 @@ def load_session(explicit: str | None = None) -> str:
 def build_session(session_id: str) -> requests.Session:
     sess = requests.Session()
     sess.headers.update(
-        {"cookie": f"session={session_id}", "User-Agent": DEFAULT_USER_AGENT}
+        {
+            "cookie": f"session={session_id}",
+            "User-Agent": DEFAULT_USER_AGENT,
+            "Connection": "keep-alive",
+            "Accept-Encoding": "gzip, deflate",
+        }
+    )
+    # Everything goes to one host; keep enough pooled connections for the
+    # worker threads and retry transient gateway errors.
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.5,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False,
+        ),
     )
+    sess.mount("https://", adapter)
+    sess.mount("http://", adapter)
     return sess
 
 
+class RateLimiter:
+    """Hand out one slot every `delay` seconds across all worker threads."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = max(delay, 0)
+        self._lock = threading.Lock()
+        self._next_slot = time.monotonic()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.delay
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ReleaseCutoff:
+    """Lowest day seen unreleased so far; later days must not be fetched."""
+
+    def __init__(self) -> None:
+        self.day: int | None = None
+        self._lock = threading.Lock()
+        self._hit = threading.Event()
+
+    def mark(self, day: int) -> None:
+        with self._lock:
+            if self.day is None or day < self.day:
+                self.day = day
+        self._hit.set()
+
+    def blocks(self, day: int) -> bool:
+        return self._hit.is_set() and day > self.day
+
+
 ##################################################################################################
 # File & HTML helpers
 ##################################################################################################
 
 
+def parse_html(html: str):
+    """Parse a page with selectolax when installed, else BeautifulSoup."""
+
+    if HTMLParser is not None:
+        return HTMLParser(html)
+    return BeautifulSoup(html, BS4_PARSER)
+
+
+def find_articles(tree) -> list:
+    """Return at most the two puzzle articles (part one and part two)."""
+
+    if HTMLParser is not None:
+        first = tree.css_first("article")
+        if first is None:
+            return []
+        second = first.next
+        while second is not None and second.tag != "article":
+            second = second.next
+        return [first] if second is None else [first, second]
+    return tree.find_all("article", limit=2)
+
+
+def article_html(article) -> str:
+    return article.html if HTMLParser is not None else str(article)
+
+
+@contextmanager
+def atomic_open(path: Path) -> Iterator[BinaryIO]:
+    """Write through a temp file so an interrupted run never leaves a partial file."""
+
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    try:
+        with tmp.open("wb") as fh:
+            yield fh
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def atomic_write(path: Path, data: bytes) -> None:
+    with atomic_open(path) as fh:
+        fh.write(data)
+
+
+# HTML2Text keeps parser state between calls, so each worker thread gets its own.
+_H2T = threading.local()
+
+
+def html_to_markdown(html: str) -> str:
+    converter = getattr(_H2T, "converter", None)
+    if converter is None:
+        converter = html2text.HTML2Text()
+        converter.body_width = 0
+        converter.ignore_images = True
+        _H2T.converter = converter
+    return converter.handle(html).strip("\n")
+
+
 def save_markdown(article, path: Path) -> None:
-    h = html2text.HTML2Text()
-    h.body_width = 0
-    path.write_text(h.handle(str(article)).strip("\n"))
+    atomic_write(path, html_to_markdown(article_html(article)).encode())
 
 
-def save_input(text: str, day_dir: Path, day: int) -> None:
-    (day_dir / f"input_{day:02d}.txt").write_text(text.rstrip("\n"))
+def save_input(response: requests.Response, path: Path) -> Path:
+    """Stream the input body to disk, dropping trailing newlines."""
 
+    pending = b""
+    with atomic_open(path) as fh:
+        for chunk in response.iter_content(CHUNK_SIZE):
+            body = chunk.rstrip(b"\n")
+            if body:
+                fh.write(pending + body)
+                pending = b""
+            pending += chunk[len(body) :]
+    return path
 
-def extract_example(soup: BeautifulSoup) -> str | None:
-    block = soup.select_one("article pre code")
+
+def extract_example(tree) -> str | None:
+    if HTMLParser is not None:
+        block = tree.css_first("article pre code")
+        return block.text().rstrip("\n") if block else None
+
+    block = tree.select_one("article pre code")
     if block:
         return block.get_text("\n").rstrip("\n")
     return None
@@ -231,23 +384,26 @@ def extract_example(soup: BeautifulSoup) -> str | None:
 
 def precreate_day(
     day: int,
+    day_dir: Path,
     *,
     copy_template: bool,
     force_template: bool,
     scaffold_rust: bool,
-    cargo_toml: Path,
+    registered_bins: set[str],
+    new_bins: list[str],
     rust_template: Path,
 ) -> None:
-    """Create day folder and drop templates even before release."""
+    """Create day folder and drop templates (also before release)."""
 
-    day_dir = Path(f"Day_{day:02d}")
     day_dir.mkdir(parents=True, exist_ok=True)
 
     if copy_template:
         copy_python_template(day, day_dir, force_template)
 
     if scaffold_rust:
-        scaffold_rust_bin(day, day_dir, cargo_toml, rust_template)
+        block = scaffold_rust_bin(day, day_dir, registered_bins, rust_template)
+        if block:
+            new_bins.append(block)
 
 
 def copy_python_template(day: int, day_dir: Path, force_template: bool) -> None:
@@ -259,11 +415,15 @@ def copy_python_template(day: int, day_dir: Path, force_template: bool) -> None:
         shutil.copyfile(TEMPLATE_FILE, solution_path)
     else:
         logger.warning(
-            f"Template {TEMPLATE_FILE} not found; skipping copy for Day {day}"
+            "Template %s not found; skipping copy for Day %d", TEMPLATE_FILE, day
         )
 
 
-def scaffold_rust_bin(day: int, day_dir: Path, cargo_toml: Path, rust_template: Path):
+def scaffold_rust_bin(
+    day: int, day_dir: Path, registered_bins: set[str], rust_template: Path
+) -> str | None:
+    """Write dayXX.rs if missing; return its `[[bin]]` block if Cargo.toml lacks one."""
+
     bin_path = day_dir / f"day{day:02d}.rs"
     if not bin_path.exists():
         contents = (
@@ -273,23 +433,40 @@ def scaffold_rust_bin(day: int, day_dir: Path, cargo_toml: Path, rust_template:
             "{{DAY_PAD}}", f"{day:02d}"
         )
         bin_path.write_text(contents)
-        logger.info(f"Created Rust bin {bin_path}")
-    register_bin_in_cargo(day, cargo_toml)
+        logger.info("Created Rust bin %s", bin_path)
+    return bin_block(day, registered_bins)
 
 
-def register_bin_in_cargo(day: int, cargo_toml: Path) -> None:
+def read_registered_bins(cargo_toml: Path) -> set[str]:
+    """Return every `name = "..."` already declared in Cargo.toml."""
+
+    if not cargo_toml.exists():
+        return set()
+    return set(_BIN_NAME_RE.findall(cargo_toml.read_text()))
+
+
+def bin_block(day: int, registered_bins: set[str]) -> str | None:
     name = f"day{day:02d}"
+    if name in registered_bins:
+        return None
+
+    registered_bins.add(name)
+    return "\n[[bin]]\n" f'name = "{name}"\n' f'path = "Day_{day:02d}/{name}.rs"\n'
+
+
+def register_bins_in_cargo(blocks: list[str], cargo_toml: Path) -> None:
+    """Append all new `[[bin]]` blocks to Cargo.toml in a single write."""
+
+    if not blocks:
+        return
     if not cargo_toml.exists():
-        logger.warning(f"Cargo.toml not found; cannot register bin {name}")
+        logger.warning("Cargo.toml not found; cannot register %d bin(s)", len(blocks))
         return
 
     text = cargo_toml.read_text()
-    if re.search(rf'name\s*=\s*"{re.escape(name)}"', text):
-        return
-
-    block = "\n[[bin]]\n" f'name = "{name}"\n' f'path = "Day_{day:02d}/{name}.rs"\n'
-    cargo_toml.write_text(text.rstrip() + block + "\n")
-    logger.info(f"Registered bin {name} in Cargo.toml")
+    entries = "\n".join(sorted(block.strip() for block in blocks))
+    cargo_toml.write_text(text.rstrip() + "\n" + entries + "\n")
+    logger.info("Registered %d bin(s) in Cargo.toml", len(blocks))
 
 
 ##################################################################################################
@@ -297,73 +474,139 @@ def register_bin_in_cargo(day: int, cargo_toml: Path) -> None:
 ##################################################################################################
 
 
+def unlock_time(year: int, day: int) -> datetime:
+    # Puzzles unlock at midnight US Eastern (UTC-5 in December).
+    return datetime(year, 12, day, 5, tzinfo=timezone.utc)
+
+
+def fetch_input(session: requests.Session, input_url: str, input_path: Path) -> int:
+    """Download the day's input to `input_path`; return the HTTP status."""
+
+    with session.get(input_url, stream=True) as input_response:
+        if input_response.status_code == 200:
+            input_path.parent.mkdir(parents=True, exist_ok=True)
+            save_input(input_response, input_path)
+        return input_response.status_code
+
+
+def save_puzzle_page(
+    html: str, day_dir: Path, instr1: Path, instr2: Path, example_path: Path
+) -> bool:
+    """Write instructions and example from a puzzle page; False if it has none."""
+
+    tree = parse_html(html)
+    articles = find_articles(tree)
+    if not articles:
+        return False
+
+    day_dir.mkdir(parents=True, exist_ok=True)
+
+    # Save instructions
+    save_markdown(articles[0], instr1)
+    if len(articles) > 1:
+        save_markdown(articles[1], instr2)
+
+    # Save example (first code block)
+    example = extract_example(tree)
+    if example:
+        atomic_write(example_path, example.encode())
+    return True
+
+
 def process_day(
     day: int,
     *,
     year: int,
     session: requests.Session,
+    limiter: RateLimiter,
+    cutoff: ReleaseCutoff,
+    wait_unlock: float,
     copy_template: bool,
     force_template: bool,
     scaffold_rust: bool,
-    cargo_toml: Path,
+    registered_bins: set[str],
+    new_bins: list[str],
     rust_template: Path,
 ) -> bool:
     puzzle_url = f"https://adventofcode.com/{year}/day/{day}"
-    logger.info(f"Day {day}: fetching {puzzle_url}")
-    puzzle_response = session.get(puzzle_url)
-
-    if puzzle_response.status_code == 404:
-        logger.info(f"Day {day}: not released yet (404)")
+    input_url = f"https://adventofcode.com/{year}/day/{day}/input"
+    day_str = f"{day:02d}"
+    day_dir = Path("Day_" + day_str)
+    instr1 = day_dir / "instructions-one.md"
+    instr2 = day_dir / "instructions-two.md"
+    example_path = day_dir / f"Example_{day_str}.txt"
+    input_path = day_dir / f"input_{day_str}.txt"
+
+    have_input = input_path.exists()
+    if have_input and instr2.exists() and not force_template:
+        logger.info("Day %d: cached, skipping", day)
         precreate_day(
             day,
+            day_dir,
             copy_template=copy_template,
             force_template=force_template,
             scaffold_rust=scaffold_rust,
-            cargo_toml=cargo_toml,
+            registered_bins=registered_bins,
+            new_bins=new_bins,
             rust_template=rust_template,
         )
-        return False
-    if puzzle_response.status_code != 200:
-        logger.warning(f"Day {day}: HTTP {puzzle_response.status_code}, skipping")
         return True
 
-    soup = BeautifulSoup(puzzle_response.text, "html.parser")
-    articles = soup.find_all("article")
-    if not articles:
-        logger.info(f"Day {day}: page has no articles yet, stopping")
+    until_unlock = (unlock_time(year, day) - datetime.now(timezone.utc)).total_seconds()
+    if 0 < until_unlock <= wait_unlock:
+        logger.info("Day %d: unlocks in %.0fs, waiting", day, until_unlock)
+        time.sleep(until_unlock + UNLOCK_GRACE)
+    elif until_unlock > 0:
+        if cutoff.blocks(day):
+            return False
+        logger.info("Day %d: not unlocked yet, skipping fetch", day)
+        cutoff.mark(day)
         return False
 
-    day_dir = Path(f"Day_{day:02d}")
-    day_dir.mkdir(parents=True, exist_ok=True)
-
-    # Save instructions
-    save_markdown(articles[0], day_dir / "instructions-one.md")
-    if len(articles) > 1:
-        save_markdown(articles[1], day_dir / "instructions-two.md")
+    # An earlier day may turn out unreleased before or while we wait for a slot.
+    if cutoff.blocks(day):
+        return False
+    limiter.wait()
+    if cutoff.blocks(day):
+        return False
 
-    # Save example (first code block)
-    example = extract_example(soup)
-    if example:
-        (day_dir / f"Example_{day:02d}.txt").write_text(example)
+    logger.info("Day %d: fetching %s", day, puzzle_url)
+    puzzle_response = session.get(puzzle_url)
 
-    # Fetch input
-    input_url = f"https://adventofcode.com/{year}/day/{day}/input"
-    input_response = session.get(input_url)
-    if input_response.status_code == 200:
-        save_input(input_response.text, day_dir, day)
-    else:
-        logger.warning(
-            f"Day {day}: input unavailable (HTTP {input_response.status_code})"
-        )
+    if puzzle_response.status_code == 404:
+        logger.info("Day %d: not released yet (404)", day)
+        cutoff.mark(day)
+        return False
+    if puzzle_response.status_code != 200:
+        logger.warning("Day %d: HTTP %d, skipping", day, puzzle_response.status_code)
+        return True
 
-    # Copy template
-    if copy_template:
-        copy_python_template(day, day_dir, force_template)
+    if not save_puzzle_page(
+        puzzle_response.text, day_dir, instr1, instr2, example_path
+    ):
+        logger.info("Day %d: page has no articles yet, stopping", day)
+        cutoff.mark(day)
+        return False
 
-    if scaffold_rust:
-        scaffold_rust_bin(day, day_dir, cargo_toml, rust_template)
+    # Fetch input
+    if not have_input:
+        status = fetch_input(session, input_url, input_path)
+        if status != 200:
+            logger.warning("Day %d: input unavailable (HTTP %d)", day, status)
+
+    # Copy templates
+    precreate_day(
+        day,
+        day_dir,
+        copy_template=copy_template,
+        force_template=force_template,
+        scaffold_rust=scaffold_rust,
+        registered_bins=registered_bins,
+        new_bins=new_bins,
+        rust_template=rust_template,
+    )
 
-    logger.info(f"Day {day}: done")
+    logger.info("Day %d: done", day)
     return True
 
 
@@ -372,6 +615,20 @@ def process_day(
 ##################################################################################################
 
 
+def day_number(value: str) -> int:
+    day = int(value)
+    if not 1 <= day <= 25:
+        raise argparse.ArgumentTypeError(f"day must be between 1 and 25, got {day}")
+    return day
+
+
+def seconds(value: str) -> float:
+    secs = float(value)
+    if secs < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative, got {value}")
+    return secs
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Fetch AoC pages and scaffold day folders"
@@ -383,16 +640,35 @@ def main():
         help="Year to fetch (default: %(default)s)",
     )
     parser.add_argument(
-        "--start-day", type=int, default=1, help="First day to attempt (default: 1)"
+        "--start-day",
+        type=day_number,
+        default=1,
+        help="First day to attempt (default: 1)",
     )
     parser.add_argument(
-        "--end-day", type=int, default=25, help="Last day to attempt (default: 25)"
+        "--end-day",
+        type=day_number,
+        default=25,
+        help="Last day to attempt (default: 25)",
     )
     parser.add_argument(
         "--delay",
         type=float,
         default=DEFAULT_DELAY,
-        help="Seconds to sleep between days (default: %(default)s)",
+        help="Minimum seconds between starting two days (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--wait-unlock",
+        type=seconds,
+        default=0,
+        metavar="SECONDS",
+        help="Wait for a day that unlocks within SECONDS instead of skipping it",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Days fetched concurrently (default: %(default)s)",
     )
     parser.add_argument(
         "--skip-template",
@@ -425,22 +701,70 @@ def main():
     print("Starting to fetch Advent of Code data...")
     cargo_toml = Path("Cargo.toml")
     rust_template = Path(args.rust_template)
+    registered_bins = read_registered_bins(cargo_toml)
+    new_bins: list[str] = []
 
-    for day in range(args.start_day, args.end_day + 1):
-        ok = process_day(
+    limiter = RateLimiter(args.delay)
+    cutoff = ReleaseCutoff()
+
+    def run_day(day: int) -> bool:
+        return process_day(
             day,
             year=args.year,
             session=session,
+            limiter=limiter,
+            cutoff=cutoff,
+            wait_unlock=args.wait_unlock,
             copy_template=not args.skip_template,
             force_template=args.force_template,
             scaffold_rust=not args.no_rust,
-            cargo_toml=cargo_toml,
+            registered_bins=registered_bins,
+            new_bins=new_bins,
             rust_template=rust_template,
         )
-        if not ok:
-            print(f"Day {day} not available yet; stopping.")
+
+    # Days after the first locked one cannot be out either; don't even queue them.
+    now = datetime.now(timezone.utc)
+    days = []
+    for day in range(args.start_day, args.end_day + 1):
+        days.append(day)
+        if (unlock_time(args.year, day) - now).total_seconds() > args.wait_unlock:
             break
-        time.sleep(max(args.delay, 0))
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(args.workers, 1)) as pool:
+            futures = {pool.submit(run_day, day): day for day in days}
+            try:
+                for future in as_completed(futures):
+                    if future.cancelled() or future.result():
+                        continue
+                    # Later days cannot be out before this one; drop unstarted ones.
+                    for pending, pending_day in futures.items():
+                        if cutoff.blocks(pending_day):
+                            pending.cancel()
+            except BaseException:
+                # Don't keep fetching the rest of the range before reporting the error.
+                pool.shutdown(cancel_futures=True)
+                raise
+
+        # Workers race past each other, so only pre-create once the first
+        # unreleased day is known, as the sequential loop did.
+        if cutoff.day is not None:
+            precreate_day(
+                cutoff.day,
+                Path(f"Day_{cutoff.day:02d}"),
+                copy_template=not args.skip_template,
+                force_template=args.force_template,
+                scaffold_rust=not args.no_rust,
+                registered_bins=registered_bins,
+                new_bins=new_bins,
+                rust_template=rust_template,
+            )
+    finally:
+        register_bins_in_cargo(new_bins, cargo_toml)
+
+    if cutoff.day is not None:
+        print(f"Day {cutoff.day} not available yet; stopping.")
 
     print("Done fetching Advent of Code data.")
 